@@ -1,11 +1,17 @@
 import os
+import re
 import json
+import statistics
+from concurrent.futures import ThreadPoolExecutor
 from openai import OpenAI
 from dotenv import load_dotenv
 
 load_dotenv()
 
-def run_ats_analysis(resume_file, job_description_file, output_file, api_key=None):
+DEFAULT_ATS_MODEL = "gpt-4.1-mini"
+
+def run_ats_analysis(resume_file, job_description_file, output_file, api_key=None, client=None,
+                     resume_text=None, model=DEFAULT_ATS_MODEL):
     """
     Run ATS analysis on a resume against a job description
     
@@ -14,21 +20,36 @@ def run_ats_analysis(resume_file, job_description_file, output_file, api_key=Non
         job_description_file (str): Path to the job description file (.txt, .md, etc.)
         output_file (str): Path to save the analysis results (.md)
         api_key (str, optional): OpenAI API key. Defaults to None (uses env variable).
+        client (OpenAI, optional): Pre-built client to reuse. Defaults to None (creates one).
+        resume_text (str, optional): Already extracted resume text. Defaults to None (reads resume_file).
+        model (str, optional): Model used for the analysis. Defaults to gpt-4.1-mini.
     
     Returns:
         dict: Analysis results
     """
+    system_prompt, user_prompt = build_ats_prompts(resume_file, job_description_file, resume_text)
+    
+    # Initialize OpenAI client
+    client = client or OpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'))
+    
+    analysis = request_ats_analysis(client, model, system_prompt, user_prompt)
+    
+    # Save the analysis to a file
+    save_analysis(analysis, output_file)
+    
+    return analysis
+
+def build_ats_prompts(resume_file, job_description_file, resume_text=None):
+    """Return the (system, user) prompts for an ATS analysis of the resume against the job description."""
     # Load content from files
     with open(job_description_file, 'r', encoding='utf-8') as f:
         job_description = f.read()
     
     # Convert docx to text for analysis
-    from docx import Document
-    doc = Document(resume_file)
-    resume_text = '\n'.join([para.text for para in doc.paragraphs])
-    
-    # Initialize OpenAI client
-    client = OpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'))
+    if resume_text is None:
+        from docx import Document
+        doc = Document(resume_file)
+        resume_text = '\n'.join([para.text for para in doc.paragraphs])
     
     # The ATS scoring prompt
     system_prompt = """You are CareerForgeAI, an elite career strategist and resume optimization specialist with 15+ years of executive recruitment experience across Fortune 500 companies and specialized in applicant tracking systems (ATS) algorithms."""
@@ -57,23 +78,198 @@ Job Description:
 Make sure your analysis is natural-sounding with varied sentence structures and vocabulary to avoid AI detection.
 """
     
+    return system_prompt, user_prompt
+
+def request_ats_analysis(client, model, system_prompt, user_prompt):
     # Make the API call
     response = client.chat.completions.create(
-        model="gpt-4.1-mini",
+        model=model,
         messages=[
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt}
         ]
     )
     
-    analysis = response.choices[0].message.content
-    
-    # Save the analysis to a file
-    os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    return response.choices[0].message.content
+
+def save_analysis(analysis, output_file):
+    if not output_file:
+        return
+    output_dir = os.path.dirname(output_file)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
     with open(output_file, 'w', encoding='utf-8') as f:
         f.write(analysis)
-    
-    return analysis
+
+# The scale itself, e.g. "Score (0-100):" or "0–100", which must not be read as a score of 0
+SCORE_RANGE = re.compile(r'\(?\b0\s*(?:-|–|—|to)\s*100\b\)?', re.IGNORECASE)
+# A score number that is not part of a decimal ("7.5") or of another scale ("8/10", "8 out of 10")
+_SCORE_NUMBER = r'(?<![\d.])(\d{1,3})(?![\d.,]\d|\s*(?:/|out of)\s*(?!100\b)\d)'
+SCORE_PATTERNS = [
+    re.compile(r'score[^0-9\n]{0,40}?' + _SCORE_NUMBER + r'\s*(?:/\s*100|%|out of 100)', re.IGNORECASE),
+    re.compile(_SCORE_NUMBER + r'\s*(?:/\s*100|out of 100)', re.IGNORECASE),
+    # "Score: 72 - Moderate match", or a heading with the number on the next line ("## Score\n\n**72**")
+    re.compile(r'score[^0-9\n]{0,40}?(?:\n\s*[*_]{0,2})?' + _SCORE_NUMBER + r'\b', re.IGNORECASE),
+]
+
+MISSING_MARKERS = ('missing', 'not present', 'not found', "don't appear", 'do not appear', 'absent', 'lacking')
+# Labels that start another part of the analysis, e.g. "Present:" or "Matched keywords:"
+END_LABELS = ('present', 'matched', 'matching', 'found', 'included', 'strength', 'summary',
+              'recommendation', 'overall', 'score')
+
+def parse_ats_score(analysis):
+    """Return the ATS compatibility score (0-100) stated in an analysis, or None if none is found."""
+    analysis = SCORE_RANGE.sub(' ', analysis)
+    for pattern in SCORE_PATTERNS:
+        for match in pattern.finditer(analysis):
+            score = int(match.group(1))
+            if 0 <= score <= 100:
+                return score
+    return None
+
+def _split_keywords(text):
+    keywords = set()
+    for item in re.split(r'[,;]', text):
+        # Drop markdown emphasis and trailing explanations such as "Kafka (mentioned twice)"
+        item = re.split(r'\s[-–—]\s|\(|:', item.replace('*', '').replace('`', ''))[0]
+        item = item.strip(' .').lower()
+        if item and len(item) <= 40:
+            keywords.add(item)
+    return keywords
+
+def parse_missing_keywords(analysis):
+    """
+    Return the set of keywords an analysis reports as missing from the resume.
+
+    Looks for "Missing: a, b, c" style lines and for lists under a heading or
+    label that mentions missing keywords. In such a list, "- Term: why" bullets
+    count as Term, and numbered items count only directly under a Missing
+    heading. A real heading, a known label such as "Present:" or, after an
+    inline "Missing: a, b" line, a numbered section line ends the list.
+    """
+    missing = set()
+    in_missing = False
+    numbered_items = False
+    for line in analysis.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        is_heading = stripped.startswith('#') or bool(re.fullmatch(r'\*\*[^*]+\*\*:?', stripped))
+        is_numbered = bool(re.match(r'\d+[.)]\s', stripped))
+        is_bullet = bool(re.match(r'([-•+]|\*(?!\*))\s', stripped))
+        label = re.sub(r'^(#+|[-*•+]|\d+[.)])\s*', '', stripped).replace('*', '').strip()
+        head, sep, tail = label.partition(':')
+        if any(marker in head.lower() for marker in MISSING_MARKERS):
+            in_missing = True
+            numbered_items = not tail.strip()
+            missing |= _split_keywords(tail)
+        elif not in_missing:
+            continue
+        elif is_heading or (sep and any(marker in head.lower() for marker in END_LABELS)):
+            in_missing = False
+        elif is_numbered and not numbered_items:
+            # A section line such as "2. Content Strength Evaluation"
+            in_missing = False
+        elif is_numbered or is_bullet:
+            # Once bullets are used, a numbered line is the next section
+            numbered_items = numbered_items and is_numbered
+            missing |= _split_keywords(head)
+    return missing
+
+def aggregate_ats_results(results):
+    """
+    Aggregate several analyses of the same resume.
+
+    Args:
+        results (list): dicts with 'model', 'score' and 'missing_keywords' per sample
+
+    Returns:
+        dict: median score, per-sample scores, how many samples flagged each
+        missing keyword, the keywords a majority agree on, and the mean
+        pairwise overlap (Jaccard) of the samples' missing-keyword sets
+    """
+    scores = [r['score'] for r in results if r['score'] is not None]
+    keyword_counts = {}
+    for r in results:
+        for keyword in r['missing_keywords']:
+            keyword_counts[keyword] = keyword_counts.get(keyword, 0) + 1
+
+    overlaps = []
+    for i in range(len(results)):
+        for j in range(i + 1, len(results)):
+            a, b = results[i]['missing_keywords'], results[j]['missing_keywords']
+            if a or b:
+                overlaps.append(len(a & b) / len(a | b))
+
+    return {
+        'median_score': statistics.median(scores) if scores else None,
+        'scores': [{'model': r['model'], 'score': r['score']} for r in results],
+        'missing_keywords': dict(sorted(keyword_counts.items(), key=lambda kv: (-kv[1], kv[0]))),
+        'consensus_missing_keywords': sorted(k for k, n in keyword_counts.items() if n * 2 > len(results)),
+        'keyword_agreement': round(statistics.mean(overlaps), 3) if overlaps else None,
+    }
+
+def run_ats_ensemble(resume_file, job_description_file, output_file, models=None, samples=1,
+                     api_key=None, client=None, resume_text=None):
+    """
+    Run the ATS analysis on every model `samples` times concurrently and aggregate the results.
+
+    The markdown analysis whose score is closest to the median is saved to
+    output_file, so it stays comparable with a single-call run.
+
+    Args:
+        models (list, optional): Models to query. Defaults to [gpt-4.1-mini].
+        samples (int, optional): Analyses per model. Defaults to 1.
+        (other arguments as for run_ats_analysis)
+
+    Returns:
+        dict: Aggregated results (see aggregate_ats_results) plus the number
+        of failed_samples, which are left out of the aggregate
+    """
+    if samples < 1:
+        raise ValueError(f"samples must be at least 1, got {samples}")
+    models = models or [DEFAULT_ATS_MODEL]
+    system_prompt, user_prompt = build_ats_prompts(resume_file, job_description_file, resume_text)
+    client = client or OpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'))
+
+    runs = [model for model in models for _ in range(samples)]
+    with ThreadPoolExecutor(max_workers=len(runs)) as executor:
+        futures = [
+            (model, executor.submit(request_ats_analysis, client, model, system_prompt, user_prompt))
+            for model in runs
+        ]
+
+    # Drop failed samples and aggregate the rest; only give up if none succeeded
+    completed = []
+    failures = []
+    for model, future in futures:
+        try:
+            completed.append((model, future.result()))
+        except Exception as e:
+            print(f"Warning: ATS analysis with {model} failed: {e}")
+            failures.append(e)
+    if not completed:
+        raise RuntimeError(f"All {len(runs)} ATS analyses failed") from failures[-1]
+    runs = [model for model, _ in completed]
+    analyses = [analysis for _, analysis in completed]
+
+    results = [
+        {'model': model, 'score': parse_ats_score(analysis), 'missing_keywords': parse_missing_keywords(analysis)}
+        for model, analysis in zip(runs, analyses)
+    ]
+    for result in results:
+        if result['score'] is None:
+            print(f"Warning: no ATS score found in the analysis from {result['model']}; left out of the median")
+    summary = aggregate_ats_results(results)
+    summary['failed_samples'] = len(failures)
+
+    representative = analyses[0]
+    if summary['median_score'] is not None:
+        scored = [(abs(r['score'] - summary['median_score']), i) for i, r in enumerate(results) if r['score'] is not None]
+        representative = analyses[min(scored)[1]]
+    save_analysis(representative, output_file)
+
+    return summary
 
 if __name__ == "__main__":
     import argparse
@@ -4,10 +4,15 @@ import sys
 import argparse
 import datetime
 import json
+import time
+from io import BytesIO
+from docx import Document
 from dotenv import load_dotenv
-from make_resume import patch_docx
+from openai import OpenAI
+from docxedit import extract_placeholders
+from make_resume import patch_docx, extract_base_mapping
 from get_diff_and_render import get_diff_from_gpt
-from ats_analysis import run_ats_analysis
+from ats_analysis import run_ats_analysis, run_ats_ensemble, parse_ats_score, DEFAULT_ATS_MODEL
 
 load_dotenv()
 
@@ -16,7 +21,38 @@ def ensure_dir(directory):
     if not os.path.exists(directory):
         os.makedirs(directory)
 
-def automate_resume_process(job_description_path, company_name=None, output_dir=None):
+class TailoringContext:
+    """
+    Master resume, placeholder template and LLM client loaded once and shared
+    across tailoring runs, so repeated runs skip re-reading and re-parsing them.
+    """
+
+    def __init__(self, base_resume_path=None, template_path=None, client=None, api_key=None):
+        self.base_resume_path = base_resume_path or os.path.join('data', 'Harsha_Master.docx')
+        self.template_path = template_path or os.path.join('data', 'placeholder_resume.docx')
+
+        with open(self.template_path, 'rb') as f:
+            self.template_bytes = f.read()
+        if self.template_path.lower().endswith('.dotx'):
+            # patch_docx falls back to the base resume for .dotx templates
+            self.placeholders = extract_placeholders(Document(self.base_resume_path))
+        else:
+            self.placeholders = extract_placeholders(Document(BytesIO(self.template_bytes)))
+
+        base_doc = Document(self.base_resume_path)
+        self.resume_text = '\n'.join([para.text for para in base_doc.paragraphs])
+        self.base_mapping = extract_base_mapping(self.base_resume_path)
+
+        self.client = client or OpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'))
+
+    def template(self):
+        """Return a fresh handle on the template for patch_docx to load."""
+        if self.template_path.lower().endswith('.dotx'):
+            return self.template_path
+        return BytesIO(self.template_bytes)
+
+def automate_resume_process(job_description_path, company_name=None, output_dir=None, context=None,
+                            ats_models=None, ats_samples=1, diff_candidates=1):
     """
     Automate the entire resume tailoring and analysis workflow.
     
@@ -24,10 +60,28 @@ def automate_resume_process(job_description_path, company_name=None, output_dir=
         job_description_path (str): Path to the job description file
         company_name (str, optional): Name of the company (used for folder naming)
         output_dir (str, optional): Base output directory. Defaults to 'output'
+        context (TailoringContext, optional): Preloaded resume, template and client.
+            Defaults to None (loads them for this run).
+        ats_models (list, optional): Models to fan the ATS analyses out to concurrently.
+            Defaults to None (a single gpt-4.1-mini call).
+        ats_samples (int, optional): ATS analyses per model. Defaults to 1.
+        diff_candidates (int, optional): Diffs to request concurrently, keeping the best-scoring one.
+            Defaults to 1.
+
+    Returns:
+        dict: Paths of the generated analyses and resume files, the before/after
+            ATS scores and per-step timings in seconds
     """
+    if ats_samples < 1:
+        raise ValueError(f"ats_samples must be at least 1, got {ats_samples}")
+    if diff_candidates < 1:
+        raise ValueError(f"diff_candidates must be at least 1, got {diff_candidates}")
+    if context is None:
+        context = TailoringContext()
+
     # Setup paths and directories
-    base_resume_path = os.path.join('data', 'Harsha_Master.docx')
-    template_path = os.path.join('data', 'placeholder_resume.docx')  # Use the new placeholder template
+    base_resume_path = context.base_resume_path
+    template_path = context.template_path
     
     # Create timestamp for unique ID
     timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -47,38 +101,65 @@ def automate_resume_process(job_description_path, company_name=None, output_dir=
     tailored_docx_path = os.path.join(output_dir, "Resume.docx")
     tailored_pdf_path = os.path.join(output_dir, "Resume.pdf")
     final_analysis_path = os.path.join(output_dir, 'analysis_after_updating.md')
+    ats_summary_path = os.path.join(output_dir, 'ats_summary.json')
+    use_ensemble = bool(ats_models) or ats_samples > 1
     
     print(f"Starting resume tailoring process for {company_name}...")
     print(f"All outputs will be saved to {output_dir}")
     
     # Step 1: Initial ATS Analysis
+    timings = {}
     print("\n=== STEP 1: Running initial ATS analysis ===")
-    run_ats_analysis(
-        resume_file=base_resume_path,
-        job_description_file=job_description_path,
-        output_file=initial_analysis_path
-    )
+    step_start = time.perf_counter()
+    if use_ensemble:
+        initial_summary = run_ats_ensemble(
+            resume_file=base_resume_path,
+            job_description_file=job_description_path,
+            output_file=initial_analysis_path,
+            models=ats_models,
+            samples=ats_samples,
+            client=context.client,
+            resume_text=context.resume_text
+        )
+        initial_score = initial_summary['median_score']
+        print(f"Initial median ATS score: {initial_score}")
+    else:
+        initial_score = parse_ats_score(run_ats_analysis(
+            resume_file=base_resume_path,
+            job_description_file=job_description_path,
+            output_file=initial_analysis_path,
+            client=context.client,
+            resume_text=context.resume_text
+        ))
+    timings['initial_analysis'] = time.perf_counter() - step_start
     print(f"Initial ATS analysis saved to {initial_analysis_path}")
     
     # Step 2: Generate tailoring recommendations (diff)
     print("\n=== STEP 2: Generating tailoring recommendations ===")
+    step_start = time.perf_counter()
     diff_data = get_diff_from_gpt(
         jd_path=job_description_path,
         template_path=template_path,
         base_path=base_resume_path,
-        api_key=os.getenv('OPENAI_API_KEY')
+        client=context.client,
+        placeholders=context.placeholders,
+        resume_text=context.resume_text,
+        candidates=diff_candidates
     )
     # Parse diff JSON directly (do not save to file)
     diff_json = json.loads(diff_data)
     print(f"Tailoring recommendations generated in memory.")
+    timings['diff'] = time.perf_counter() - step_start
     
     # Step 3: Generate tailored resume
     print("\n=== STEP 3: Generating tailored resume ===")
+    step_start = time.perf_counter()
     patch_docx(
-        template_path=template_path,
+        template_path=context.template(),
         diff_json=diff_json,
         base_path=base_resume_path,
-        out_path=tailored_docx_path
+        out_path=tailored_docx_path,
+        base_mapping=context.base_mapping
     )
     print(f"Tailored resume (DOCX) saved to {tailored_docx_path}")
     
@@ -89,29 +170,76 @@ def automate_resume_process(job_description_path, company_name=None, output_dir=
         print(f"Tailored resume (PDF) saved to {tailored_pdf_path}")
     except Exception as e:
         print(f"Warning: Failed to convert to PDF: {e}")
+    timings['resume'] = time.perf_counter() - step_start
     
     # Step 4: Final ATS Analysis
     print("\n=== STEP 4: Running final ATS analysis ===")
-    run_ats_analysis(
-        resume_file=tailored_docx_path,
-        job_description_file=job_description_path,
-        output_file=final_analysis_path
-    )
+    step_start = time.perf_counter()
+    if use_ensemble:
+        final_summary = run_ats_ensemble(
+            resume_file=tailored_docx_path,
+            job_description_file=job_description_path,
+            output_file=final_analysis_path,
+            models=ats_models,
+            samples=ats_samples,
+            client=context.client
+        )
+        final_score = final_summary['median_score']
+        print(f"Final median ATS score: {final_score}")
+    else:
+        final_score = parse_ats_score(run_ats_analysis(
+            resume_file=tailored_docx_path,
+            job_description_file=job_description_path,
+            output_file=final_analysis_path,
+            client=context.client
+        ))
+    timings['final_analysis'] = time.perf_counter() - step_start
     print(f"Final ATS analysis saved to {final_analysis_path}")
+
+    if use_ensemble:
+        score_delta = None
+        if initial_summary['median_score'] is not None and final_summary['median_score'] is not None:
+            score_delta = final_summary['median_score'] - initial_summary['median_score']
+        with open(ats_summary_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'models': ats_models or [DEFAULT_ATS_MODEL],
+                'samples': ats_samples,
+                'before': initial_summary,
+                'after': final_summary,
+                'score_delta': score_delta,
+            }, f, indent=2)
+        print(f"ATS score delta: {score_delta} (summary saved to {ats_summary_path})")
     
     print("\nResume tailoring process complete!")
     print(f"Review the analyses in {output_dir} to see the improvements.")
 
+    return {
+        'output_dir': output_dir,
+        'initial_analysis': initial_analysis_path,
+        'resume_docx': tailored_docx_path,
+        'resume_pdf': tailored_pdf_path if os.path.exists(tailored_pdf_path) else None,
+        'final_analysis': final_analysis_path,
+        'ats_summary': ats_summary_path if use_ensemble else None,
+        'scores': {'before': initial_score, 'after': final_score},
+        'timings': {step: round(seconds, 3) for step, seconds in timings.items()},
+    }
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Automate resume tailoring and ATS analysis')
     parser.add_argument('--job', required=True, help='Path to job description file')
     parser.add_argument('--company', help='Company name (for folder naming)')
     parser.add_argument('--output', help='Base output directory')
+    parser.add_argument('--ats-models', nargs='+', help='Run the ATS analyses concurrently on these models and aggregate them')
+    parser.add_argument('--ats-samples', type=int, default=1, help='ATS analyses per model (aggregated by median score)')
+    parser.add_argument('--diff-candidates', type=int, default=1, help='Request this many diffs concurrently and keep the best-scoring one')
     
     args = parser.parse_args()
     
     automate_resume_process(
         job_description_path=args.job,
         company_name=args.company,
-        output_dir=args.output
+        output_dir=args.output,
+        ats_models=args.ats_models,
+        ats_samples=args.ats_samples,
+        diff_candidates=args.diff_candidates
     ) 
\ No newline at end of file
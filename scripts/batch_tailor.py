@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+import os
+import json
+import time
+import hashlib
+import argparse
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+from automate_resume import TailoringContext, automate_resume_process
+
+load_dotenv()
+
+JD_EXTENSIONS = ('.txt', '.md')
+
+def iter_job_descriptions(paths):
+    """Yield job description files from the given files and directories (directories in name order)."""
+    for path in paths:
+        if os.path.isdir(path):
+            with os.scandir(path) as entries:
+                for entry in sorted(entries, key=lambda e: e.name):
+                    if entry.is_file() and entry.name.lower().endswith(JD_EXTENSIONS):
+                        yield entry.path
+        else:
+            yield path
+
+def normalize_jd_path(path):
+    """Absolute, normalised JD path, so './data/jds/a.txt' and 'data/jds/a.txt' are the same job."""
+    return os.path.normpath(os.path.abspath(path))
+
+def job_output_name(jd_path):
+    """
+    Output folder name for a JD: its file stem plus a short hash of its normalised
+    path, so same-named JDs from different directories never share a folder.
+    """
+    stem = os.path.splitext(os.path.basename(jd_path))[0]
+    digest = hashlib.sha1(normalize_jd_path(jd_path).encode('utf-8')).hexdigest()[:8]
+    return f"{stem}_{digest}"
+
+def load_finished(manifest_path):
+    """Return the normalised JD paths already recorded as done in an existing manifest."""
+    finished = set()
+    if not os.path.exists(manifest_path):
+        return finished
+    with open(manifest_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A partially written last line from an interrupted run
+                continue
+            if record.get('status') == 'done':
+                finished.add(normalize_jd_path(record['job_description']))
+    return finished
+
+class ManifestWriter:
+    """Append one JSON line per finished job, flushed immediately so progress survives a crash."""
+
+    def __init__(self, path):
+        manifest_dir = os.path.dirname(path)
+        if manifest_dir:
+            os.makedirs(manifest_dir, exist_ok=True)
+        self.file = open(path, 'a', encoding='utf-8')
+        self.lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record) + '\n'
+        with self.lock:
+            self.file.write(line)
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+def run_batch_job(context, manifest, jd_path, output_root, ats_models=None, ats_samples=1, diff_candidates=1):
+    """Tailor one JD and record the outcome; nothing from the run is kept after it is written."""
+    jd_path = normalize_jd_path(jd_path)
+    company_name = os.path.splitext(os.path.basename(jd_path))[0]
+    output_dir = os.path.join(output_root, job_output_name(jd_path))
+    started_at = datetime.datetime.now().isoformat(timespec='seconds')
+    start = time.perf_counter()
+    record = {
+        'job_description': jd_path,
+        'company': company_name,
+        'output_dir': output_dir,
+        'started_at': started_at,
+    }
+    try:
+        outputs = automate_resume_process(
+            job_description_path=jd_path,
+            company_name=company_name,
+            output_dir=output_dir,
+            context=context,
+            ats_models=ats_models,
+            ats_samples=ats_samples,
+            diff_candidates=diff_candidates
+        )
+        record.update(status='done', error=None, scores=outputs.pop('scores'),
+                      timings=outputs.pop('timings'), outputs=outputs)
+    except (Exception, SystemExit) as e:
+        # patch_docx exits on unreplaced placeholders; record it and keep the batch going
+        record.update(status='failed', error=f"{type(e).__name__}: {e}")
+    record['duration_s'] = round(time.perf_counter() - start, 3)
+    record['finished_at'] = datetime.datetime.now().isoformat(timespec='seconds')
+    manifest.write(record)
+    return record['status']
+
+def run_batch(jd_paths, output_root='output', manifest_path=None, max_in_flight=4, resume=False,
+              ats_models=None, ats_samples=1, diff_candidates=1, context=None):
+    """
+    Tailor the resume for every JD, streaming one manifest line per finished job.
+
+    JDs are read lazily and at most max_in_flight jobs are queued or running at
+    once, so memory stays flat however many JDs are given.
+
+    Args:
+        jd_paths (list): JD files and/or directories of .txt/.md JDs
+        output_root (str, optional): Directory holding one output folder per JD
+            (see job_output_name). Defaults to 'output'.
+        manifest_path (str, optional): JSONL manifest. Defaults to <output_root>/manifest.jsonl.
+        max_in_flight (int, optional): Cap on concurrently queued/running jobs. Defaults to 4.
+        resume (bool, optional): Skip JDs the manifest already records as done. Defaults to False.
+        ats_models, ats_samples, diff_candidates: Passed through to automate_resume_process.
+        context (TailoringContext, optional): Shared preloaded context. Defaults to None (loads one).
+
+    Returns:
+        dict: Counts of done, failed and skipped jobs
+    """
+    manifest_path = manifest_path or os.path.join(output_root, 'manifest.jsonl')
+    finished = load_finished(manifest_path) if resume else set()
+    context = context or TailoringContext()
+    manifest = ManifestWriter(manifest_path)
+    counts = {'done': 0, 'failed': 0, 'skipped': 0}
+    counts_lock = threading.Lock()
+    slots = threading.BoundedSemaphore(max_in_flight)
+
+    def on_done(future):
+        try:
+            status = 'failed' if future.exception() else future.result()
+            with counts_lock:
+                counts[status] += 1
+        finally:
+            slots.release()
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='batch') as executor:
+            for jd_path in iter_job_descriptions(jd_paths):
+                if normalize_jd_path(jd_path) in finished:
+                    with counts_lock:
+                        counts['skipped'] += 1
+                    continue
+                # Block until a slot frees up instead of queueing every JD at once
+                slots.acquire()
+                future = executor.submit(run_batch_job, context, manifest, jd_path, output_root,
+                                         ats_models, ats_samples, diff_candidates)
+                future.add_done_callback(on_done)
+    finally:
+        manifest.close()
+
+    print(f"\nBatch complete: {counts['done']} done, {counts['failed']} failed, {counts['skipped']} skipped.")
+    print(f"Manifest: {manifest_path}")
+    return counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Tailor the resume for many job descriptions')
+    parser.add_argument('jobs', nargs='+', help='JD files and/or directories of .txt/.md JDs')
+    parser.add_argument('--output', default='output', help='Base output directory (one <name>_<hash> folder per JD)')
+    parser.add_argument('--manifest', help='Path to the JSONL results manifest (defaults to <output>/manifest.jsonl)')
+    parser.add_argument('--max-in-flight', type=int, default=4, help='Maximum number of jobs queued or running at once')
+    parser.add_argument('--resume', action='store_true', help='Skip JDs already recorded as done in the manifest')
+    parser.add_argument('--ats-models', nargs='+', help='Run the ATS analyses concurrently on these models and aggregate them')
+    parser.add_argument('--ats-samples', type=int, default=1, help='ATS analyses per model')
+    parser.add_argument('--diff-candidates', type=int, default=1, help='Request this many diffs concurrently per JD and keep the best-scoring one')
+    parser.add_argument('--base', help='Path to the base resume (defaults to data/Harsha_Master.docx)')
+    parser.add_argument('--template', help='Path to the placeholder template (defaults to data/placeholder_resume.docx)')
+    parser.add_argument('--stub-llm', action='store_true', help='Use an offline stub instead of the OpenAI API')
+
+    args = parser.parse_args()
+
+    client = None
+    if args.stub_llm:
+        from stub_llm import StubLLMClient
+        client = StubLLMClient()
+
+    run_batch(
+        jd_paths=args.jobs,
+        output_root=args.output,
+        manifest_path=args.manifest,
+        max_in_flight=args.max_in_flight,
+        resume=args.resume,
+        ats_models=args.ats_models,
+        ats_samples=args.ats_samples,
+        diff_candidates=args.diff_candidates,
+        context=TailoringContext(
+            base_resume_path=args.base,
+            template_path=args.template,
+            client=client
+        )
+    )
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+import io
+import os
+import sys
+import json
+import random
+import argparse
+import platform
+import tempfile
+import statistics
+import time
+import resource
+import tracemalloc
+import multiprocessing
+from contextlib import redirect_stdout
+from docx import Document
+from docxedit import replace_string, extract_placeholders, preprocess_document
+from make_resume import extract_base_mapping, bold_skill_labels, patch_docx
+
+SKILL_LABELS = [
+    "Languages & Frameworks",
+    "Cloud & DevOps",
+    "APIs & Integration",
+    "Databases & Storage",
+]
+
+METRICS = {
+    "median_s": "median wall time of the call in seconds",
+    "min_s": "fastest wall time of the call in seconds",
+    "py_heap_peak_kib": "peak Python-heap allocation during the call (tracemalloc; excludes libxml2/C memory)",
+    "rss_peak_kib": "peak resident set size of a fresh subprocess running the case (includes C memory)",
+}
+
+FILLER_WORDS = ["Designed", "scalable", "services", "with", "Python", "and", "AWS", "for", "retail", "analytics"]
+
+def make_synthetic_template(n_placeholders, runs_per_paragraph=6, table_ratio=0.25, split_ratio=0.3, seed=0):
+    """
+    Build a placeholder template with n_placeholders and return it as DOCX bytes.
+
+    Each placeholder lives in a paragraph padded with filler runs. A share of
+    them are split across several runs (as Word does after formatting edits)
+    and a share are placed in table cells. Every tenth placeholder is a skills
+    line so bold_skill_labels has work to do.
+    """
+    rng = random.Random(seed)
+    doc = Document()
+    table_count = int(n_placeholders * table_ratio)
+    table = doc.add_table(rows=max(table_count, 1), cols=1) if table_count else None
+    table_row = 0
+
+    for i in range(n_placeholders):
+        if i % 10 == 0:
+            name = f"SKILLS_CAT{i}"
+        else:
+            name = f"JOB{i // 10 + 1}_POINT{i % 10}"
+        placeholder = f"<{name}>"
+
+        if table is not None and table_row < table_count and rng.random() < table_ratio:
+            para = table.rows[table_row].cells[0].paragraphs[0]
+            table_row += 1
+        else:
+            para = doc.add_paragraph()
+
+        if name.startswith("SKILLS_"):
+            para.add_run(f"{SKILL_LABELS[i % len(SKILL_LABELS)]}: ")
+        else:
+            for _ in range(runs_per_paragraph // 2):
+                para.add_run(rng.choice(FILLER_WORDS) + " ")
+
+        if rng.random() < split_ratio:
+            cut = rng.randint(1, len(placeholder) - 1)
+            para.add_run(placeholder[:cut])
+            para.add_run(placeholder[cut:])
+        else:
+            para.add_run(placeholder)
+
+        if not name.startswith("SKILLS_"):
+            for _ in range(runs_per_paragraph - runs_per_paragraph // 2):
+                para.add_run(" " + rng.choice(FILLER_WORDS))
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def make_diff(placeholders):
+    return {ph: f"Tailored content for {ph.strip('<>').lower()} using Python and AWS." for ph in placeholders}
+
+def build_cases(template_bytes, template_path):
+    """
+    Return (name, setup, run) triples. setup() builds fresh inputs outside the
+    timed region; run(inputs) is the measured call.
+    """
+    def load():
+        return Document(io.BytesIO(template_bytes))
+
+    def preprocessed():
+        return preprocess_document(load())
+
+    placeholders = extract_placeholders(preprocess_document(load()))
+    diff = make_diff(placeholders)
+
+    def replace_all(doc):
+        for ph in placeholders:
+            replace_string(doc, ph, diff[ph])
+
+    def replaced():
+        doc = preprocessed()
+        replace_all(doc)
+        return doc
+
+    def run_patch(out_path):
+        with redirect_stdout(io.StringIO()):
+            patch_docx(template_path, diff, template_path, out_path)
+
+    out_path = os.path.join(os.path.dirname(template_path), "patched.docx")
+    return [
+        ("preprocess_document", load, preprocess_document),
+        ("extract_placeholders", preprocessed, extract_placeholders),
+        ("replace_string", preprocessed, replace_all),
+        ("bold_skill_labels", replaced, bold_skill_labels),
+        ("extract_base_mapping", lambda: template_path, extract_base_mapping),
+        ("patch_docx", lambda: out_path, run_patch),
+    ]
+
+def _max_rss_kib():
+    # ru_maxrss is in KiB on Linux but in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 if sys.platform == "darwin" else rss
+
+def _measure_rss_in_child(template_path, case_name):
+    # Runs in a fresh interpreter so the peak RSS belongs to this case alone
+    with open(template_path, "rb") as f:
+        template_bytes = f.read()
+    for name, setup, run in build_cases(template_bytes, template_path):
+        if name == case_name:
+            run(setup())
+            return {"rss_peak_kib": _max_rss_kib()}
+    raise ValueError(f"Unknown benchmark case {case_name}")
+
+def measure_rss(template_path, case_name):
+    """
+    Peak resident memory of one call, measured in a fresh subprocess.
+
+    Unlike tracemalloc this includes libxml2 (C) allocations, where python-docx
+    keeps the document tree. The peak also covers the interpreter, imports and
+    the case's setup, so compare it across runs rather than read it in isolation.
+    """
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_measure_rss_in_child, (template_path, case_name))
+
+def measure(setup, run, repeat):
+    """
+    Time run(setup()) `repeat` times and record the Python-heap peak of one
+    extra call (tracemalloc; C allocations such as libxml2 are not included).
+    """
+    timings = []
+    for _ in range(repeat):
+        inputs = setup()
+        start = time.perf_counter()
+        run(inputs)
+        timings.append(time.perf_counter() - start)
+
+    inputs = setup()
+    tracemalloc.start()
+    run(inputs)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "median_s": statistics.median(timings),
+        "min_s": min(timings),
+        "py_heap_peak_kib": peak / 1024,
+    }
+
+def run_benchmarks(sizes, repeat=5, runs_per_paragraph=6, only=None):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in sizes:
+            template_bytes = make_synthetic_template(size, runs_per_paragraph=runs_per_paragraph)
+            template_path = os.path.join(tmpdir, f"template_{size}.docx")
+            with open(template_path, "wb") as f:
+                f.write(template_bytes)
+            for name, setup, run in build_cases(template_bytes, template_path):
+                if only and name not in only:
+                    continue
+                key = f"{name}[{size}]"
+                results[key] = measure(setup, run, repeat)
+                results[key].update(measure_rss(template_path, name))
+                print(f"  {key:<32} median {results[key]['median_s'] * 1000:9.2f} ms"
+                      f"   py heap {results[key]['py_heap_peak_kib']:9.1f} KiB"
+                      f"   rss peak {results[key]['rss_peak_kib']:9.0f} KiB")
+    return results
+
+def compare(results, baseline, threshold):
+    """Return a list of regression messages for results slower or larger than baseline by more than threshold."""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        for metric in ("median_s", "py_heap_peak_kib", "rss_peak_kib"):
+            # Baselines from older versions may lack a metric
+            if previous.get(metric) and current[metric] > previous[metric] * (1 + threshold):
+                change = (current[metric] / previous[metric] - 1) * 100
+                regressions.append(f"{key} {metric}: {previous[metric]:.4g} -> {current[metric]:.4g} (+{change:.0f}%)")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark DOCX patching and extraction on synthetic templates")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100, 500], help="Placeholder counts to generate")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per case")
+    parser.add_argument("--runs-per-paragraph", type=int, default=6, help="Filler runs around each placeholder")
+    parser.add_argument("--only", nargs="+", help="Only run these functions (e.g. replace_string patch_docx)")
+    parser.add_argument("--output", help="Path to save results JSON")
+    parser.add_argument("--baseline", help="Baseline results JSON to compare against")
+    parser.add_argument("--save-baseline", help="Path to save these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown/growth before flagging a regression")
+
+    args = parser.parse_args()
+
+    print(f"Benchmarking sizes {args.sizes} ({args.repeat} repetitions each)...")
+    results = run_benchmarks(args.sizes, args.repeat, args.runs_per_paragraph, args.only)
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "metrics": METRICS,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\nERROR: {len(regressions)} regression(s) over {args.threshold:.0%} against {args.baseline}:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nNo regressions over {args.threshold:.0%} against {args.baseline}.")
@@ -1,38 +1,118 @@
 from docx import Document
+import os
 import re
 import sys
+import json
+import html
+import zipfile
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from docxedit import extract_placeholders, PLACEHOLDER_PATTERN
 
-def extract_placeholders(doc):
-    # Find all unique placeholders in the document (e.g., <PLACEHOLDER>)
+DOCX_EXTENSIONS = ('.docx', '.dotx')
+
+# Parts of the package that hold visible text
+TEXT_PARTS = re.compile(r'word/(document|header\d*|footer\d*|footnotes|endnotes)\.xml$')
+TEXT_RUN = re.compile(r'<w:t(?:\s[^>]*)?>([^<]*)</w:t>')
+
+# Placeholder-like tokens that will never match PLACEHOLDER_PATTERN:
+# lowercase inside the brackets, a missing '>' or a missing '<'
+MALFORMED_PATTERNS = [
+    re.compile(r'<[A-Za-z][A-Za-z0-9_&]*>'),
+    re.compile(r'<[A-Z][A-Z0-9_&]*_[A-Z0-9_&]*(?![A-Z0-9_&>])'),
+    re.compile(r'(?<![<A-Z0-9_&])[A-Z][A-Z0-9&]*_[A-Z0-9_&]*>'),
+]
+
+def iter_paragraph_texts(xml):
+    """Yield the text of each paragraph in a WordprocessingML part, joining runs split by formatting."""
+    for chunk in xml.split('</w:p>'):
+        runs = TEXT_RUN.findall(chunk)
+        if runs:
+            yield html.unescape(''.join(runs))
+
+def audit_file(path):
+    """
+    Scan a DOCX package's XML directly (no python-docx build) and report the
+    placeholders and malformed placeholder-like tokens left in it.
+    """
     placeholders = set()
-    pattern = re.compile(r'<[A-Z0-9_&]+>')
-    
-    # Extract from paragraphs
-    for para in doc.paragraphs:
-        for match in pattern.findall(para.text):
-            placeholders.add(match)
-    
-    # Extract from tables
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for para in cell.paragraphs:
-                    for match in pattern.findall(para.text):
-                        placeholders.add(match)
-    
-    return list(placeholders)
+    malformed = set()
+    try:
+        with zipfile.ZipFile(path) as package:
+            for name in package.namelist():
+                if not TEXT_PARTS.match(name):
+                    continue
+                xml = package.read(name).decode('utf-8')
+                for text in iter_paragraph_texts(xml):
+                    found = PLACEHOLDER_PATTERN.findall(text)
+                    placeholders.update(found)
+                    for pattern in MALFORMED_PATTERNS:
+                        malformed.update(m for m in pattern.findall(text) if m not in found)
+    except (OSError, zipfile.BadZipFile, UnicodeDecodeError) as e:
+        return {'file': path, 'placeholders': [], 'malformed': [], 'error': f"{type(e).__name__}: {e}"}
+    return {'file': path, 'placeholders': sorted(placeholders), 'malformed': sorted(malformed), 'error': None}
+
+def iter_docx_files(paths):
+    """Yield DOCX/DOTX files from the given files and directories (searched recursively)."""
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    # Skip Word's "~$" lock files
+                    if name.lower().endswith(DOCX_EXTENSIONS) and not name.startswith('~$'):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+def audit_paths(paths, workers=None, include_clean=False):
+    """
+    Audit every DOCX under paths in parallel across processes.
+
+    Returns:
+        dict: counts of scanned files and of files with leftover placeholders,
+        malformed tokens or read errors, plus the per-file results for the
+        flagged files (or all files with include_clean)
+    """
+    files = list(iter_docx_files(paths))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(audit_file, files, chunksize=max(1, len(files) // 64)))
+    flagged = [r for r in results if r['placeholders'] or r['malformed'] or r['error']]
+    return {
+        'scanned': len(results),
+        'flagged': len(flagged),
+        'files': results if include_clean else flagged,
+    }
 
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python check_placeholders.py <docx_file>")
-        sys.exit(1)
-    
-    file_path = sys.argv[1]
-    try:
-        doc = Document(file_path)
-        placeholders = extract_placeholders(doc)
-        print(f"\nFound {len(placeholders)} placeholders in {file_path}:")
-        for ph in sorted(placeholders):
-            print(f"  {ph}")
-    except Exception as e:
-        print(f"Error: {e}") 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="List placeholders in a DOCX, or audit many files/directories")
+    parser.add_argument("paths", nargs="+", help="DOCX files and/or directories to scan")
+    parser.add_argument("--json", action="store_true", help="Bulk audit: report leftover and malformed placeholders as JSON")
+    parser.add_argument("--all", action="store_true", help="Include clean files in the JSON report")
+    parser.add_argument("--workers", type=int, help="Number of processes for the bulk audit (defaults to CPU count)")
+    parser.add_argument("--output", help="Path to save the JSON report (defaults to stdout)")
+
+    args = parser.parse_args()
+
+    bulk = args.json or len(args.paths) > 1 or os.path.isdir(args.paths[0])
+    if not bulk:
+        file_path = args.paths[0]
+        try:
+            doc = Document(file_path)
+            placeholders = extract_placeholders(doc)
+            print(f"\nFound {len(placeholders)} placeholders in {file_path}:")
+            for ph in sorted(placeholders):
+                print(f"  {ph}")
+        except Exception as e:
+            print(f"Error: {e}")
+        sys.exit(0)
+
+    report = audit_paths(args.paths, args.workers, include_clean=args.all)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"Audited {report['scanned']} files, {report['flagged']} flagged. Report saved to {args.output}")
+    else:
+        print(output)
+    sys.exit(1 if report['flagged'] else 0)
@@ -1,123 +1,140 @@
 from docx import Document
 import re
 
+PLACEHOLDER_PATTERN = re.compile(r'<[A-Z0-9_&]+>')
+
+def _iter_block_paragraphs(container, seen_cells):
+    # Paragraphs of a body, cell, header or footer, then its tables (recursing into nested tables)
+    for para in container.paragraphs:
+        yield para
+    for table in container.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                # Merged cells are returned once per grid position; visit them once.
+                # Keep the elements themselves: lxml proxies (and their ids) are recycled once unreferenced
+                if cell._tc in seen_cells:
+                    continue
+                seen_cells.add(cell._tc)
+                yield from _iter_block_paragraphs(cell, seen_cells)
+
+def iter_paragraphs(doc):
+    """
+    Yield every paragraph in the document: body paragraphs, table cells
+    (including nested tables), then headers and footers of each section.
+    """
+    seen_cells = set()
+    yield from _iter_block_paragraphs(doc, seen_cells)
+
+    seen_parts = set()
+    for section in doc.sections:
+        for part in (section.header, section.first_page_header, section.even_page_header,
+                     section.footer, section.first_page_footer, section.even_page_footer):
+            # Linked headers/footers have no content of their own; touching them would add one
+            if part.is_linked_to_previous:
+                continue
+            if part.part in seen_parts:
+                continue
+            seen_parts.add(part.part)
+            yield from _iter_block_paragraphs(part, seen_cells)
+
+def visit_paragraphs(doc, *visitors):
+    """
+    Walk the document once, calling each visitor(paragraph) in order on every
+    paragraph, so several passes share a single traversal.
+    """
+    for para in iter_paragraphs(doc):
+        for visitor in visitors:
+            visitor(para)
+    return doc
+
+def replace_in_paragraph(paragraph, old_string, new_string):
+    """
+    Replace old_string with new_string in a single paragraph, handling cases
+    where the placeholder might be split across multiple runs.
+    Returns True if a replacement was made.
+    """
+    # Find all runs that together contain the placeholder
+    text = ''.join(run.text for run in paragraph.runs)
+    if old_string not in text:
+        return False
+
+    # Find the start and end run indices for the placeholder
+    joined = ''
+    start_idx = end_idx = None
+    for i, run in enumerate(paragraph.runs):
+        if start_idx is None and old_string.startswith(run.text):
+            joined = run.text
+            start_idx = i
+            if joined == old_string:
+                end_idx = i
+                break
+        elif start_idx is not None:
+            joined += run.text
+            if joined == old_string:
+                end_idx = i
+                break
+    # If not found as split, fallback to simple replace in one run
+    if start_idx is None or end_idx is None:
+        for run in paragraph.runs:
+            if old_string in run.text:
+                run.text = run.text.replace(old_string, new_string)
+                return True
+        return False
+    # Merge runs and replace
+    first_run = paragraph.runs[start_idx]
+    # Concatenate text before, replace, and after
+    before = ''.join(run.text for run in paragraph.runs[:start_idx])
+    after = ''.join(run.text for run in paragraph.runs[end_idx+1:])
+    new_full = before + new_string + after
+    # Remove all runs
+    for _ in range(len(paragraph.runs)):
+        paragraph.runs[0]._element.getparent().remove(paragraph.runs[0]._element)
+    # Add new run with merged text, copy style from first_run
+    new_run = paragraph.add_run(new_full)
+    new_run.bold = first_run.bold
+    new_run.italic = first_run.italic
+    new_run.underline = first_run.underline
+    new_run.font.size = first_run.font.size
+    new_run.font.name = first_run.font.name
+    new_run.style = first_run.style
+    return True
+
 def replace_string(doc, old_string, new_string):
     """
     Replace all occurrences of old_string with new_string in the document,
     handling cases where the placeholder might be split across multiple runs.
     Preserve styles of the original runs as much as possible.
     """
-    def process_paragraph(paragraph):
-        # Find all runs that together contain the placeholder
-        text = ''.join(run.text for run in paragraph.runs)
-        if old_string not in text:
-            return False
-        
-        # Find the start and end run indices for the placeholder
-        joined = ''
-        start_idx = end_idx = None
-        for i, run in enumerate(paragraph.runs):
-            if start_idx is None and old_string.startswith(run.text):
-                joined = run.text
-                start_idx = i
-                if joined == old_string:
-                    end_idx = i
-                    break
-            elif start_idx is not None:
-                joined += run.text
-                if joined == old_string:
-                    end_idx = i
-                    break
-        # If not found as split, fallback to simple replace in one run
-        if start_idx is None or end_idx is None:
-            for run in paragraph.runs:
-                if old_string in run.text:
-                    run.text = run.text.replace(old_string, new_string)
-                    return True
-            return False
-        # Merge runs and replace
-        first_run = paragraph.runs[start_idx]
-        # Concatenate text before, replace, and after
-        before = ''.join(run.text for run in paragraph.runs[:start_idx])
-        after = ''.join(run.text for run in paragraph.runs[end_idx+1:])
-        new_full = before + new_string + after
-        # Remove all runs
-        for _ in range(len(paragraph.runs)):
-            paragraph.runs[0]._element.getparent().remove(paragraph.runs[0]._element)
-        # Add new run with merged text, copy style from first_run
-        new_run = paragraph.add_run(new_full)
-        new_run.bold = first_run.bold
-        new_run.italic = first_run.italic
-        new_run.underline = first_run.underline
-        new_run.font.size = first_run.font.size
-        new_run.font.name = first_run.font.name
-        new_run.style = first_run.style
-        return True
-    # Process all paragraphs in the document
-    for para in doc.paragraphs:
-        process_paragraph(para)
-    # Also handle tables
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for para in cell.paragraphs:
-                    process_paragraph(para)
+    visit_paragraphs(doc, lambda para: replace_in_paragraph(para, old_string, new_string))
 
 def extract_placeholders(doc):
     # Find all unique placeholders in the document (e.g., <PLACEHOLDER>)
     placeholders = set()
-    pattern = re.compile(r'<[A-Z0-9_&]+>')
-    
-    # Extract from paragraphs
-    for para in doc.paragraphs:
-        for match in pattern.findall(para.text):
-            placeholders.add(match)
-    
-    # Extract from tables
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for para in cell.paragraphs:
-                    for match in pattern.findall(para.text):
-                        placeholders.add(match)
-    
+    visit_paragraphs(doc, lambda para: placeholders.update(PLACEHOLDER_PATTERN.findall(para.text)))
     return list(placeholders)
 
+def merge_split_placeholders(para):
+    """
+    Merge the runs of a paragraph whose placeholders are split across runs
+    due to formatting, so they can be matched and replaced.
+    """
+    # If there's a potential placeholder marker '<' or partial match
+    if any('<' in run.text for run in para.runs) and len(para.runs) > 1:
+        # Get the paragraph text and look for placeholders
+        text = para.text
+        placeholders_in_para = PLACEHOLDER_PATTERN.findall(text)
+
+        # If there are placeholders but they're not in individual runs, we need to merge
+        if placeholders_in_para and not any(ph in run.text for ph in placeholders_in_para for run in para.runs):
+            # Clear and recreate runs
+            for i in range(len(para.runs)):
+                para.runs[0]._element.getparent().remove(para.runs[0]._element)
+            para.add_run(text)
+
 # Check if placeholders are split across runs and merge them
 def preprocess_document(doc):
     """
     Preprocess document to identify and merge runs that might contain partial placeholders.
     This helps when placeholders are split across runs due to formatting.
     """
-    pattern = re.compile(r'<[A-Z0-9_&]+>')
-    
-    # Process paragraphs
-    for para in doc.paragraphs:
-        # If there's a potential placeholder marker '<' or partial match
-        if any('<' in run.text for run in para.runs) and len(para.runs) > 1:
-            # Get the paragraph text and look for placeholders
-            text = para.text
-            placeholders_in_para = pattern.findall(text)
-            
-            # If there are placeholders but they're not in individual runs, we need to merge
-            if placeholders_in_para and not any(ph in run.text for ph in placeholders_in_para for run in para.runs):
-                # Clear and recreate runs
-                for i in range(len(para.runs)):
-                    para.runs[0]._element.getparent().remove(para.runs[0]._element)
-                para.add_run(text)
-    
-    # Process tables
-    for table in doc.tables:
-        for row in table.rows:
-            for cell in row.cells:
-                for para in cell.paragraphs:
-                    if any('<' in run.text for run in para.runs) and len(para.runs) > 1:
-                        text = para.text
-                        placeholders_in_para = pattern.findall(text)
-                        
-                        if placeholders_in_para and not any(ph in run.text for ph in placeholders_in_para for run in para.runs):
-                            for i in range(len(para.runs)):
-                                para.runs[0]._element.getparent().remove(para.runs[0]._element)
-                            para.add_run(text)
-    
-    return doc 
\ No newline at end of file
+    return visit_paragraphs(doc, merge_split_placeholders)
@@ -7,6 +7,7 @@ import os
 from docx2pdf import convert
 import re
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from docxedit import extract_placeholders
 
 load_dotenv()
@@ -17,22 +18,215 @@ def extract_json_from_markdown(text):
         return match.group(1)
     return text
 
-def get_diff_from_gpt(jd_path, template_path, base_path, api_key=None):
-    client = OpenAI(api_key=api_key)
+# Character/item limits requested in the prompt, used to score candidate diffs locally
+SUMMARY_LENGTH = (370, 420)
+POINT_LENGTH = (180, 235)
+MAX_SKILLS = 7
+
+KEYWORD_STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it', 'of', 'on', 'or',
+    'our', 'the', 'this', 'to', 'we', 'will', 'with', 'you', 'your', 'who', 'what', 'about', 'us',
+    'experience', 'team', 'teams', 'work', 'role', 'years', 'strong', 'ability', 'including',
+    'if', 'all', 'any', 'can', 'may', 'must', 'not', 'no', 'so', 'up', 'do', 'he', 'she', 'they', 'their',
+    'plus', 'have', 'has', 'nice', 'excellent', 'solid', 'deep', 'good', 'great', 'e.g', 'i.e', 'etc',
+    # Job-posting boilerplate
+    'employer', 'employment', 'opportunity', 'equal', 'company', 'corp', 'corporation', 'inc', 'llc', 'ltd',
+    'senior', 'junior', 'staff', 'principal', 'lead', 'software', 'engineer', 'engineers', 'developer',
+    'position', 'job', 'manager', 'managers', 'product', 'data', 'business', 'customer', 'customers',
+    'candidate', 'candidates', 'applicants', 'responsibilities', 'requirements', 'qualifications',
+    'preferred', 'required', 'bonus', 'benefits', 'salary', 'compensation', 'remote', 'hybrid', 'onsite',
+    'location', 'eoe', 'pto', 'usd', 'medical', 'dental', 'vision', 'insurance',
+    # Education
+    'degree', 'bachelor', "bachelor's", 'bachelors', 'master', "master's", 'masters', 'bs', 'ms', 'ba', 'phd',
+    'computer', 'science', 'engineering', 'equivalent', 'related', 'field',
+    # Words that introduce skills rather than name them
+    'knowledge', 'proficiency', 'familiarity', 'expertise', 'skills', 'tools', 'technologies',
+    'frameworks', 'languages', 'hands-on',
+}
+
+# Technical terms usually written in lowercase, which the capitalization rule would miss
+LOWERCASE_TECH_TERMS = {
+    'dbt', 'git', 'npm', 'yarn', 'pnpm', 'pip', 'pandas', 'numpy', 'scipy', 'pytest', 'kubectl', 'helm',
+    'bash', 'zsh', 'vim', 'curl', 'gradle', 'maven', 'webpack', 'vite', 'jest', 'nginx', 'redis', 'grpc',
+    'jq', 'awk', 'sed', 'cron', 'systemd', 'linux', 'unix', 'sql', 'nosql', 'spark', 'kafka', 'airflow',
+}
+
+# Lines describing the posting rather than the skills, e.g. "Location: Seattle, WA"
+JD_METADATA_LINE = re.compile(
+    r'^\W*(location|salary|compensation|pay|company|employer|about us|benefits|eeo)\b[^:\n]{0,20}:.*$',
+    re.IGNORECASE | re.MULTILINE
+)
+# Headings of the sections that list skills, and phrases that introduce skills on any line
+SKILL_SECTION = re.compile(
+    r'requirement|qualification|skill|must.have|nice.to.have|preferred|bring|stack|technolog|tools|you have|looking for',
+    re.IGNORECASE
+)
+SKILL_LINE_CUES = re.compile(
+    r'experience (?:with|in|using)|proficien|knowledge of|familiar|expertise|hands-on|\bskills?\b|\bstack\b|'
+    r'\btools\b|technologies|such as|e\.g\.|frameworks?|languages?',
+    re.IGNORECASE
+)
+KEYWORD_TOKEN = re.compile(r"[A-Za-z][A-Za-z0-9+#./-]*[A-Za-z0-9+#]")
+
+def iter_skill_lines(job_desc):
+    """Yield the JD lines that list skills: lines under a requirements-style heading, or that introduce skills."""
+    in_section = False
+    for line in job_desc.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if JD_METADATA_LINE.match(stripped):
+            # "Benefits:", "Location: ..." and the like start a non-skills part of the posting
+            in_section = False
+        elif stripped.startswith('#') or re.fullmatch(r'\*\*[^*]+\*\*:?|[^:]{1,60}:', stripped):
+            in_section = bool(SKILL_SECTION.search(stripped))
+        elif in_section or SKILL_LINE_CUES.search(stripped):
+            yield re.sub(r'^(?:[-*•>]+|\d+[.)])\s*', '', stripped)
+
+def extract_jd_keywords(job_desc):
+    """
+    Return the technical keywords of a job description, taken from its skill
+    lines (see iter_skill_lines; the whole JD if it has none): terms with an
+    inner capital, digit or symbol (e.g. 'AWS', 'Node.js', 'CI/CD'), known
+    lowercase tools such as 'dbt', and capitalized words that do not just
+    start a sentence. Boilerplate and education words are left out.
+    """
+    lines = list(iter_skill_lines(job_desc)) or JD_METADATA_LINE.sub('', job_desc).splitlines()
+    keywords = set()
+    for line in lines:
+        for match in KEYWORD_TOKEN.finditer(line):
+            token = match.group(0)
+            lower = token.lower()
+            if lower in KEYWORD_STOPWORDS:
+                continue
+            if lower in LOWERCASE_TECH_TERMS or any(c.isupper() or c.isdigit() or c in '+#./' for c in token[1:]):
+                keywords.add(lower)
+            elif token[0].isupper():
+                preceding = line[:match.start()].rstrip(' \t"\'(*')
+                if preceding and preceding[-1] not in '.!?':
+                    keywords.add(lower)
+    return keywords
+
+def score_diff_candidate(diff_data, placeholders, jd_keywords):
+    """
+    Score a parsed diff locally on a 0-1 scale.
+
+    Weighs length-limit compliance (SUMMARY, JOB*_POINT* and SKILLS_* limits
+    from the prompt), coverage of the JD keywords, and placeholders filled
+    with non-empty values.
+
+    Returns:
+        dict: the overall 'score' and its 'length', 'keywords' and 'filled' parts
+    """
+    values = {ph: str(diff_data.get(ph, '')).strip() for ph in placeholders}
+    filled = sum(1 for v in values.values() if v) / len(values) if values else 1.0
+
+    checks = []
+    for ph, value in values.items():
+        name = ph.strip('<>')
+        if name == 'SUMMARY':
+            checks.append(SUMMARY_LENGTH[0] <= len(value) <= SUMMARY_LENGTH[1])
+        elif '_POINT' in name:
+            checks.append(POINT_LENGTH[0] <= len(value) <= POINT_LENGTH[1])
+        elif name.startswith('SKILLS'):
+            checks.append(0 < len([s for s in value.split(',') if s.strip()]) <= MAX_SKILLS)
+    length = sum(checks) / len(checks) if checks else 1.0
+
+    text = ' '.join(values.values()).lower()
+    # Whole-term matches only, so 'java' does not count for 'javascript'
+    covered = sum(1 for k in jd_keywords if re.search(r'(?<!\w)' + re.escape(k) + r'(?!\w)', text))
+    keywords = covered / len(jd_keywords) if jd_keywords else 1.0
+
+    return {
+        'score': round(0.4 * length + 0.4 * keywords + 0.2 * filled, 4),
+        'length': round(length, 4),
+        'keywords': round(keywords, 4),
+        'filled': round(filled, 4),
+    }
+
+def parse_diff_content(content):
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        clean_content = extract_json_from_markdown(content)
+        return json.loads(clean_content)
+
+def request_best_diff(client, prompt, candidates, placeholders, job_desc):
+    """
+    Request `candidates` diffs concurrently and return (content, diff_data) of
+    the best-scoring one (see score_diff_candidate). Candidates with nested
+    values are skipped; if every parsed candidate is nested, the first one is
+    returned so the caller's flat-mapping retry can handle it.
+    """
+    def request(_):
+        response = client.chat.completions.create(
+            model="gpt-4.1",
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return response.choices[0].message.content
+
+    with ThreadPoolExecutor(max_workers=candidates) as executor:
+        futures = [executor.submit(request, i) for i in range(candidates)]
+
+    jd_keywords = extract_jd_keywords(job_desc)
+    best = None
+    nested = None
+    for i, future in enumerate(futures, 1):
+        try:
+            content = future.result()
+        except Exception as e:
+            print(f"  Candidate {i}: request failed ({type(e).__name__}: {e}), skipped")
+            continue
+        try:
+            diff_data = parse_diff_content(content)
+        except json.JSONDecodeError:
+            print(f"  Candidate {i}: invalid JSON, skipped")
+            continue
+        if not isinstance(diff_data, dict):
+            print(f"  Candidate {i}: not a JSON object, skipped")
+            continue
+        if any(isinstance(v, (list, dict)) for v in diff_data.values()):
+            print(f"  Candidate {i}: nested values, skipped")
+            nested = nested or (content, diff_data)
+            continue
+        scores = score_diff_candidate(diff_data, placeholders, jd_keywords)
+        print(f"  Candidate {i}: score {scores['score']:.3f} (length {scores['length']:.2f}, "
+              f"keywords {scores['keywords']:.2f}, filled {scores['filled']:.2f})")
+        if best is None or scores['score'] > best[0]:
+            best = (scores['score'], i, content, diff_data)
+
+    if best is None and nested is not None:
+        print(f"No flat candidate among {candidates}; using a nested one.")
+        return nested
+    if best is None:
+        raise ValueError(f"None of the {candidates} candidate diffs could be requested and parsed as a JSON object")
+    print(f"Selected candidate {best[1]} of {candidates}.")
+    return best[2], best[3]
+
+def get_diff_from_gpt(jd_path, template_path, base_path, api_key=None, client=None,
+                      placeholders=None, resume_text=None, candidates=1):
+    # client, placeholders and resume_text can be passed in by long-running callers
+    # that keep them warm, to skip re-creating the client and re-parsing the DOCX files.
+    # With candidates > 1, that many diffs are requested concurrently and the best-scoring one is kept
+    if candidates < 1:
+        raise ValueError(f"candidates must be at least 1, got {candidates}")
+    client = client or OpenAI(api_key=api_key)
     job_desc = open(jd_path).read()
     
     from docx import Document
     # Extract placeholders from the template
-    template_doc = Document(template_path)
-    placeholders = extract_placeholders(template_doc)
+    if placeholders is None:
+        template_doc = Document(template_path)
+        placeholders = extract_placeholders(template_doc)
     # Build a JSON skeleton and code block
     json_skeleton = '{\n' + ',\n'.join([f'  "{ph}": ""' for ph in placeholders]) + '\n}'
     json_template = "```json\n" + json_skeleton + "\n```"
     placeholder_keys = ', '.join(placeholders)
 
     # Extract resume text from the base resume
-    base_doc = Document(base_path)
-    resume_text = '\n'.join([para.text for para in base_doc.paragraphs])
+    if resume_text is None:
+        base_doc = Document(base_path)
+        resume_text = '\n'.join([para.text for para in base_doc.paragraphs])
 
     prompt = (
         "You are CareerForgeAI, an elite career strategist and resume optimization specialist with 15+ years of executive recruitment experience across Fortune 500 companies and specialized in applicant tracking systems (ATS) algorithms."
@@ -83,17 +277,16 @@ def get_diff_from_gpt(jd_path, template_path, base_path, api_key=None):
         f"{job_desc}"
     )
     
-    response = client.chat.completions.create(
-        model="gpt-4.1",
-        messages=[{"role": "user", "content": prompt}]
-    )
-    
-    content = response.choices[0].message.content
-    try:
-        diff_data = json.loads(content)
-    except json.JSONDecodeError:
-        clean_content = extract_json_from_markdown(content)
-        diff_data = json.loads(clean_content)
+    if candidates > 1:
+        content, diff_data = request_best_diff(client, prompt, candidates, placeholders, job_desc)
+    else:
+        response = client.chat.completions.create(
+            model="gpt-4.1",
+            messages=[{"role": "user", "content": prompt}]
+        )
+        
+        content = response.choices[0].message.content
+        diff_data = parse_diff_content(content)
     # Check for nested/sectioned output and retry if necessary
     if any(isinstance(v, (list, dict)) for v in diff_data.values()):
         print("Detected nested or sectioned output from LLM. Retrying with explicit flat mapping instructions...")
@@ -168,11 +361,12 @@ if __name__ == "__main__":
     parser.add_argument("--base", required=True, help="Path to base resume")
     parser.add_argument("--diff", required=True, help="Path to save diff JSON")
     parser.add_argument("--output", help="Path to save output resume (if specified)")
+    parser.add_argument("--candidates", type=int, default=1, help="Request this many diffs concurrently and keep the best-scoring one")
     
     args = parser.parse_args()
     
     api_key = os.getenv("OPENAI_API_KEY")
-    diff_data = get_diff_from_gpt(args.jd, args.template, args.base, api_key)
+    diff_data = get_diff_from_gpt(args.jd, args.template, args.base, api_key, candidates=args.candidates)
     
     # Save diff to a file
     with open(args.diff, "w") as f:
@@ -2,26 +2,32 @@ import json
 import sys
 import os
 from docx import Document
-from docxedit import replace_string, extract_placeholders, preprocess_document
+from docxedit import (
+    PLACEHOLDER_PATTERN, iter_paragraphs, visit_paragraphs, replace_in_paragraph,
+    merge_split_placeholders,
+)
 
 
 def extract_base_mapping(base_path):
     doc = Document(base_path)
     mapping = {}
-    placeholders = extract_placeholders(doc)
-    for ph in placeholders:
-        # Use the text in the doc as the value for the placeholder
-        for para in doc.paragraphs:
-            if ph in para.text:
-                mapping[ph] = para.text.strip()
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for para in cell.paragraphs:
-                        if ph in para.text:
-                            mapping[ph] = para.text.strip()
+    # Use the text in the doc as the value for the placeholder
+    for para in iter_paragraphs(doc):
+        for ph in PLACEHOLDER_PATTERN.findall(para.text):
+            mapping[ph] = para.text.strip()
     return mapping
 
+SKILL_PREFIXES = [
+    "Languages & Frameworks", 
+    "Cloud & DevOps", 
+    "APIs & Integration",
+    "Architecture & Design",
+    "Databases & Storage",
+    "Monitoring & Observability",
+    "Testing & CI/CD",
+    # Add other skill categories that might be in your resume format
+]
+
 def bold_skill_labels(doc):
     """
     Re‑apply bold formatting to skill category labels only.
@@ -33,97 +39,98 @@ def bold_skill_labels(doc):
     Only the text before (and including) the colon is bolded, leaving
     the skill values in normal formatting.
     """
-    # Common skill category prefixes to identify skill sections
-    skill_prefixes = [
-        "Languages & Frameworks", 
-        "Cloud & DevOps", 
-        "APIs & Integration",
-        "Architecture & Design",
-        "Databases & Storage",
-        "Monitoring & Observability",
-        "Testing & CI/CD",
-        # Add other skill categories that might be in your resume format
-    ]
-    
-    for para in doc.paragraphs:
-        # Skip paragraphs without colons
-        if ':' not in para.text:
-            continue
-            
-        # Check if this is a skills paragraph by looking for:
-        # 1. SKILLS_ placeholder pattern
-        # 2. Common skill category prefix
-        is_skills_para = False
-        if any(placeholder in para.text for placeholder in ["<SKILLS_", "<skills_"]):
+    visit_paragraphs(doc, bold_skill_label)
+
+def bold_skill_label(para):
+    """Bold the category label of a single skills paragraph (see bold_skill_labels)."""
+    # Skip paragraphs without colons
+    if ':' not in para.text:
+        return
+
+    # Check if this is a skills paragraph by looking for:
+    # 1. SKILLS_ placeholder pattern
+    # 2. Common skill category prefix
+    is_skills_para = False
+    if any(placeholder in para.text for placeholder in ["<SKILLS_", "<skills_"]):
+        is_skills_para = True
+    else:
+        text_before_colon = para.text.split(':', 1)[0].strip()
+        if any(prefix in text_before_colon for prefix in SKILL_PREFIXES):
             is_skills_para = True
-        else:
-            text_before_colon = para.text.split(':', 1)[0].strip()
-            if any(prefix in text_before_colon for prefix in skill_prefixes):
-                is_skills_para = True
-                
-        # Skip non-skills paragraphs
-        if not is_skills_para:
-            continue
             
-        # Bold the text before and including the colon
-        colon_seen = False
-        for run in para.runs:
-            if colon_seen:
-                break
-            if ':' in run.text:
-                colon_index = run.text.find(':')
-                if colon_index < len(run.text) - 1:
-                    # If colon is not at the end of the run, we need to split the run
-                    # This preserves bold formatting for text before/including colon only
-                    part1 = run.text[:colon_index+1]
-                    part2 = run.text[colon_index+1:]
-                    run.text = part1
-                    run.bold = True
-                    
-                    # Create a new run for the text after the colon
-                    new_run = para.add_run(part2)
-                    new_run.bold = False
-                    # Copy other formatting (except bold)
-                    new_run.italic = run.italic
-                    new_run.underline = run.underline
-                    new_run.font.name = run.font.name
-                    new_run.font.size = run.font.size
-                else:
-                    # Colon is at the end of the run, just bold the whole run
-                    run.bold = True
-                colon_seen = True
+    # Skip non-skills paragraphs
+    if not is_skills_para:
+        return
+        
+    # Bold the text before and including the colon
+    colon_seen = False
+    for run in para.runs:
+        if colon_seen:
+            break
+        if ':' in run.text:
+            colon_index = run.text.find(':')
+            if colon_index < len(run.text) - 1:
+                # If colon is not at the end of the run, we need to split the run
+                # This preserves bold formatting for text before/including colon only
+                part1 = run.text[:colon_index+1]
+                part2 = run.text[colon_index+1:]
+                run.text = part1
+                run.bold = True
+                
+                # Create a new run for the text after the colon
+                new_run = para.add_run(part2)
+                new_run.bold = False
+                # Copy other formatting (except bold)
+                new_run.italic = run.italic
+                new_run.underline = run.underline
+                new_run.font.name = run.font.name
+                new_run.font.size = run.font.size
             else:
+                # Colon is at the end of the run, just bold the whole run
                 run.bold = True
+            colon_seen = True
+        else:
+            run.bold = True
 
-def patch_docx(template_path, diff_json, base_path, out_path):
+def patch_docx(template_path, diff_json, base_path, out_path, base_mapping=None):
+    # template_path may also be a file-like object holding an in-memory template
     # Handle .dotx files by using a regular docx file instead
-    if template_path.lower().endswith('.dotx'):
+    if isinstance(template_path, str) and template_path.lower().endswith('.dotx'):
         print(f"Warning: Template file {template_path} is a .dotx file which may not be directly supported.")
         print("Using base resume as template and applying placeholder replacements.")
         doc = Document(base_path)
     else:
         doc = Document(template_path)
     
-    # Preprocess document to handle split placeholders
-    doc = preprocess_document(doc)
-    
-    base_mapping = extract_base_mapping(base_path)
-    placeholders = extract_placeholders(doc)
-    
-    # Track which placeholders were replaced
+    if base_mapping is None:
+        base_mapping = extract_base_mapping(base_path)
+
+    # Found placeholders in document order, and which of them were replaced
+    placeholders = {}
     replaced = set()
-    
-    for ph in placeholders:
-        if ph in diff_json:
-            replace_string(doc, ph, diff_json[ph])
-            replaced.add(ph)
-        elif ph in base_mapping:
-            replace_string(doc, ph, base_mapping[ph])
+    remaining = set()
+
+    def replace_found(para):
+        for ph in PLACEHOLDER_PATTERN.findall(para.text):
+            if ph not in placeholders:
+                placeholders[ph] = None
+                if ph not in diff_json and ph not in base_mapping:
+                    print(f"Warning: Placeholder {ph} not found in diff or base resume, leaving as is.")
+            if ph in diff_json:
+                value = diff_json[ph]
+            elif ph in base_mapping:
+                value = base_mapping[ph]
+            else:
+                continue
+            replace_in_paragraph(para, ph, value)
             replaced.add(ph)
-        else:
-            print(f"Warning: Placeholder {ph} not found in diff or base resume, leaving as is.")
 
-    bold_skill_labels(doc)  # ensure skill headings stay bold
+    def collect_remaining(para):
+        remaining.update(PLACEHOLDER_PATTERN.findall(para.text))
+
+    # One walk: merge split placeholders, replace them, re-bold skill labels
+    # (ensure skill headings stay bold) and check for anything left behind
+    visit_paragraphs(doc, merge_split_placeholders, replace_found, bold_skill_label, collect_remaining)
 
     # Log replacement details
     print(f"Found {len(placeholders)} placeholders in template:")
@@ -135,10 +142,9 @@ def patch_docx(template_path, diff_json, base_path, out_path):
     print(f"\nReplaced {len(replaced)} placeholders out of {len(placeholders)} found.")
 
     # Post-processing check for unreplaced placeholders
-    remaining_placeholders = extract_placeholders(doc)
-    if remaining_placeholders:
+    if remaining:
         print(f"\nERROR: The following placeholders were NOT replaced:")
-        for ph in remaining_placeholders:
+        for ph in remaining:
             print(f"  {ph}")
         print("\nPlease check your diff and base resume for missing keys.")
         sys.exit(1)
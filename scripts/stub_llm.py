@@ -0,0 +1,49 @@
+import re
+import time
+from types import SimpleNamespace
+
+PLACEHOLDER_KEY = re.compile(r'"(<[A-Z0-9_&]+>)"\s*:\s*""')
+
+class StubLLMClient:
+    """
+    Offline stand-in for the OpenAI client used by the tailoring scripts.
+
+    Exposes the same `client.chat.completions.create(model=..., messages=[...])`
+    shape and returns canned content: a flat placeholder JSON for diff prompts
+    and a short markdown report for ATS prompts. Useful for exercising the
+    pipeline and the tailoring service without network access or an API key.
+    """
+
+    def __init__(self, latency=0.0, score=72):
+        self.latency = latency
+        self.score = score
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model, messages, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        prompt = messages[-1]['content']
+        keys = list(dict.fromkeys(PLACEHOLDER_KEY.findall(prompt)))
+        if keys:
+            content = '{\n' + ',\n'.join(
+                f'  "{key}": "{self._fill(key)}"' for key in keys
+            ) + '\n}'
+        else:
+            content = (
+                f"ATS Compatibility Score: {self.score}/100\n\n"
+                "## Keyword Match\n"
+                "- Present: Python, AWS, Docker\n"
+                "- Missing: Kubernetes\n\n"
+                "## Content Strength\n"
+                "Stub analysis generated offline.\n"
+            )
+        message = SimpleNamespace(role='assistant', content=content)
+        return SimpleNamespace(model=model, choices=[SimpleNamespace(message=message)])
+
+    def _fill(self, key):
+        name = key.strip('<>')
+        if name.startswith('SKILLS'):
+            return 'Python, AWS, Docker, Terraform, PostgreSQL'
+        if name == 'SUMMARY':
+            return ('Software engineer with 5 years of experience building cloud services. ' * 6).strip()
+        return f'Delivered {name.lower()} work on the Stub Platform using Python and AWS, cutting latency by 30%.'
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+import os
+import re
+import json
+import uuid
+import argparse
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from dotenv import load_dotenv
+from automate_resume import TailoringContext, automate_resume_process, ensure_dir
+
+load_dotenv()
+
+class TailoringService:
+    """
+    Keeps a TailoringContext warm and runs tailoring jobs on a worker pool.
+
+    Jobs are tracked in memory by id and move through
+    queued -> running -> done | failed. Only the most recent
+    max_finished_jobs finished jobs are kept; older ones are evicted.
+    Every job requests diff_candidates diffs and keeps the best-scoring one.
+    """
+
+    def __init__(self, context, workers=2, output_root='output', max_finished_jobs=1000, diff_candidates=1):
+        if diff_candidates < 1:
+            raise ValueError(f"diff_candidates must be at least 1, got {diff_candidates}")
+        self.context = context
+        self.output_root = output_root
+        self.max_finished_jobs = max_finished_jobs
+        self.diff_candidates = diff_candidates
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='tailor')
+        self.jobs = {}
+        self.lock = threading.Lock()
+
+    def submit(self, job_description, company_name=None):
+        """Queue a tailoring job for the given JD text and return its status record."""
+        job_id = uuid.uuid4().hex[:12]
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        # The company name comes from the request; keep it to a single safe path component
+        company_name = re.sub(r'[^\w.-]', '_', os.path.basename(company_name or '')).lstrip('.')
+        company_name = company_name or f"company_{timestamp}"
+        job = {
+            'id': job_id,
+            'company': company_name,
+            'status': 'queued',
+            'output_dir': os.path.join(self.output_root, f"{company_name}_{job_id}"),
+            'outputs': None,
+            'error': None,
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'started_at': None,
+            'finished_at': None,
+        }
+        with self.lock:
+            self.jobs[job_id] = job
+        self.executor.submit(self._run, job_id, job_description)
+        return dict(job)
+
+    def get(self, job_id):
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self):
+        with self.lock:
+            return [dict(job) for job in self.jobs.values()]
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+    def _update(self, job_id, **fields):
+        with self.lock:
+            self.jobs[job_id].update(fields)
+
+    def _evict_finished(self):
+        with self.lock:
+            finished = [job_id for job_id, job in self.jobs.items() if job['status'] in ('done', 'failed')]
+            # Jobs are stored in submission order, so the oldest finished jobs go first
+            for job_id in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+                del self.jobs[job_id]
+
+    def _run(self, job_id, job_description):
+        job = self.get(job_id)
+        self._update(job_id, status='running',
+                     started_at=datetime.datetime.now().isoformat(timespec='seconds'))
+        try:
+            ensure_dir(job['output_dir'])
+            jd_path = os.path.join(job['output_dir'], 'JD.txt')
+            with open(jd_path, 'w', encoding='utf-8') as f:
+                f.write(job_description)
+            outputs = automate_resume_process(
+                job_description_path=jd_path,
+                company_name=job['company'],
+                output_dir=job['output_dir'],
+                context=self.context,
+                diff_candidates=self.diff_candidates
+            )
+            self._update(job_id, status='done', outputs=outputs)
+        except (Exception, SystemExit) as e:
+            # patch_docx calls sys.exit on unreplaced placeholders; keep the worker alive
+            self._update(job_id, status='failed', error=f"{type(e).__name__}: {e}")
+        finally:
+            self._update(job_id, finished_at=datetime.datetime.now().isoformat(timespec='seconds'))
+            self._evict_finished()
+
+def make_handler(service):
+    class TailoringRequestHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload, indent=2).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            path = self.path.rstrip('/')
+            if path == '/health':
+                self._send_json(200, {'status': 'ok'})
+            elif path == '/jobs':
+                self._send_json(200, service.list())
+            elif path.startswith('/jobs/'):
+                job = service.get(path[len('/jobs/'):])
+                if job:
+                    self._send_json(200, job)
+                else:
+                    self._send_json(404, {'error': 'job not found'})
+            else:
+                self._send_json(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/jobs':
+                self._send_json(404, {'error': 'not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+            except (ValueError, json.JSONDecodeError):
+                self._send_json(400, {'error': 'request body must be JSON'})
+                return
+            if not isinstance(payload, dict):
+                self._send_json(400, {'error': 'request body must be a JSON object'})
+                return
+            job_description = payload.get('job_description')
+            if not job_description or not isinstance(job_description, str):
+                self._send_json(400, {'error': "'job_description' is required and must be a string"})
+                return
+            if payload.get('company') is not None and not isinstance(payload['company'], str):
+                self._send_json(400, {'error': "'company' must be a string"})
+                return
+            job = service.submit(job_description, payload.get('company'))
+            self._send_json(202, job)
+
+    return TailoringRequestHandler
+
+def serve(host='127.0.0.1', port=8765, workers=2, output_root='output',
+          base_resume_path=None, template_path=None, stub_llm=False, max_finished_jobs=1000,
+          diff_candidates=1):
+    """
+    Load the tailoring context once and serve jobs over HTTP until interrupted.
+
+    Endpoints:
+        POST /jobs       {"job_description": "...", "company": "..."} -> 202 job record
+        GET  /jobs       all job records
+        GET  /jobs/<id>  a single job record (finished jobs beyond max_finished_jobs are evicted)
+        GET  /health     liveness check
+    """
+    client = None
+    if stub_llm:
+        from stub_llm import StubLLMClient
+        client = StubLLMClient()
+    context = TailoringContext(
+        base_resume_path=base_resume_path,
+        template_path=template_path,
+        client=client
+    )
+    service = TailoringService(context, workers=workers, output_root=output_root,
+                               max_finished_jobs=max_finished_jobs, diff_candidates=diff_candidates)
+    server = ThreadingHTTPServer((host, port), make_handler(service))
+    print(f"Tailoring service listening on http://{host}:{port} with {workers} worker(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down tailoring service...")
+    finally:
+        server.server_close()
+        service.shutdown()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Run the resume tailoring service')
+    parser.add_argument('--host', default='127.0.0.1', help='Host to bind')
+    parser.add_argument('--port', type=int, default=8765, help='Port to bind')
+    parser.add_argument('--workers', type=int, default=2, help='Number of concurrent tailoring jobs')
+    parser.add_argument('--output', default='output', help='Base output directory for job results')
+    parser.add_argument('--base', help='Path to the base resume (defaults to data/Harsha_Master.docx)')
+    parser.add_argument('--template', help='Path to the placeholder template (defaults to data/placeholder_resume.docx)')
+    parser.add_argument('--stub-llm', action='store_true', help='Use an offline stub instead of the OpenAI API')
+    parser.add_argument('--max-finished-jobs', type=int, default=1000, help='Finished job records kept in memory')
+    parser.add_argument('--diff-candidates', type=int, default=1, help='Request this many diffs concurrently per job and keep the best-scoring one')
+
+    args = parser.parse_args()
+
+    serve(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        output_root=args.output,
+        base_resume_path=args.base,
+        template_path=args.template,
+        stub_llm=args.stub_llm,
+        max_finished_jobs=args.max_finished_jobs,
+        diff_candidates=args.diff_candidates
+    )